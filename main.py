@@ -1,39 +1,63 @@
 import sys
-from PyQt5.QtCore import Qt, QRect
-from PyQt5.QtWidgets import QAbstractItemView, QStyledItemDelegate, QToolBar, QAction, QApplication, QWidget, QVBoxLayout, QFileDialog, QLineEdit, QTreeWidget, QTreeWidgetItem, QTreeWidgetItemIterator, QLabel, QStyle, QMenu, QDialog, QGridLayout, QDialogButtonBox
-from PyQt5.QtGui import QBrush, QColor, QIcon, QPen
+from PyQt5.QtCore import Qt, QSize, QAbstractItemModel, QModelIndex, QObject, QThread, pyqtSignal
+from PyQt5.QtWidgets import QAbstractItemView, QStyledItemDelegate, QToolBar, QAction, QApplication, QWidget, QVBoxLayout, QFileDialog, QLineEdit, QTreeView, QLabel, QStyle, QMenu, QDialog, QGridLayout, QDialogButtonBox, QMessageBox, QProgressBar
+from PyQt5.QtGui import QBrush, QColor, QIcon, QPalette
 from nbt import nbt
 import gzip
 import os
-from io import BytesIO
+import re
+import struct
+from bisect import bisect_right
+from itertools import accumulate
+
+READ_BUFFER_SIZE = 1 << 20
+NBSP = "\u00A0"
+# exact types, checked with type() so no MRO walk; NBTFile is only ever the root
+CONTAINER_TYPES = frozenset((nbt.TAG_Compound, nbt.TAG_List, nbt.NBTFile))
+
+HIGHLIGHT_ROLE = Qt.UserRole + 1
+
+BRUSH_VAL_BG = QBrush(QColor(49, 50, 68))
+BRUSH_HL_BG = QBrush(QColor(116, 199, 236))
+BRUSH_HL_FG = QBrush(QColor(17, 17, 27))
 
 class CustomDelegate(QStyledItemDelegate):
+    # rows are a fixed 30px high, so only the text width is measured in sizeHint()
+    rowHeight = 30
+    textMargin = 6
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        if index.data(HIGHLIGHT_ROLE):
+            option.backgroundBrush = BRUSH_HL_BG
+            option.palette.setBrush(QPalette.Text, BRUSH_HL_FG)
+
     def paint(self, painter, option, index):
-        painter.save()
-        if index.column() == 1:
-            if option.state & QStyle.State_Selected:
-                painter.fillRect(option.rect, option.palette.highlight())
-            else:
-                color = index.data(Qt.BackgroundRole)
-                if color is not None:
-                    painter.fillRect(option.rect, color.color())
-                else:
-                    painter.fillRect(option.rect, QColor("#313244"))
-            rect = QRect(option.rect)
-            rect.adjust(10, 0, 0, 0)
-            textColor = index.data(Qt.ForegroundRole)
-            if textColor is not None:
-                painter.setPen(QPen(textColor.color()))
-            painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, index.data())
-        else:
+        if index.column() != 1:
             super().paint(painter, option, index)
-        painter.restore()
+            return
+        highlighted = index.data(HIGHLIGHT_ROLE)
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        elif highlighted:
+            painter.fillRect(option.rect, BRUSH_HL_BG)
+        else:
+            painter.fillRect(option.rect, BRUSH_VAL_BG)
+        rect = option.rect.adjusted(10, 0, 0, 0)
+        if not highlighted:
+            painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, index.data())
+            return
+        # only the pen changes, so swap it back instead of save()/restore()
+        prevPen = painter.pen()
+        painter.setPen(BRUSH_HL_FG.color())
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, index.data())
+        painter.setPen(prevPen)
 
     def sizeHint(self, option, index):
-        size = super().sizeHint(option, index)
+        width = option.fontMetrics.horizontalAdvance(index.data() or "") + self.textMargin
         if index.column() == 1:
-            size.setWidth(size.width() + 10)
-        return size
+            width += 10
+        return QSize(width, self.rowHeight)
 
 class SearchLineEdit(QLineEdit):
     def keyPressEvent(self, event):
@@ -42,9 +66,236 @@ class SearchLineEdit(QLineEdit):
                 return
         super().keyPressEvent(event)
 
+class NBTModel(QAbstractItemModel):
+    tagColors = {
+        "Pos": QBrush(QColor("#a6e3a1")),
+        "Inventory": QBrush(QColor("#cba6f7")),
+        "Health": QBrush(QColor("#f9e2af")),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.nbtFile = None
+        # id(tag) -> (parent tag, row), filled in as indexes are handed out
+        self.locations = {}
+        # id(container) -> name column text for all of its children
+        self.labels = {}
+        self.roleData = {}
+        self.valueStrCache = {}
+
+    def setRoot(self, nbtFile):
+        self.beginResetModel()
+        self.nbtFile = nbtFile
+        self.locations = {}
+        self.labels = {}
+        self.roleData = {}
+        self.valueStrCache = {}
+        self.endResetModel()
+
+    def isContainer(self, tag):
+        return type(tag) in CONTAINER_TYPES
+
+    def tagFromIndex(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.nbtFile
+
+    def indexForTag(self, tag, column=0):
+        location = self.locations.get(id(tag))
+        if location is None:
+            return QModelIndex()
+        return self.createIndex(location[1], column, tag)
+
+    def walk(self, parentTag=None):
+        if parentTag is None:
+            parentTag = self.nbtFile
+            if parentTag is None:
+                return
+        for row, tag in enumerate(parentTag.tags):
+            self.locations[id(tag)] = (parentTag, row)
+            yield tag
+            if self.isContainer(tag):
+                yield from self.walk(tag)
+
+    def childLabels(self, parentTag):
+        labels = self.labels.get(id(parentTag))
+        if labels is None:
+            tags = parentTag.tags
+            if type(parentTag) is nbt.TAG_List:
+                names = map(str, range(len(tags)))
+            else:
+                names = [tag.name for tag in tags]
+            labels = [
+                "[" + str(len(tag)) + "] " + name if self.isContainer(tag) else NBSP + name
+                for tag, name in zip(tags, names)
+            ]
+            self.labels[id(parentTag)] = labels
+        return labels
+
+    def valueText(self, tag):
+        text = self.valueStrCache.get(id(tag))
+        if text is None:
+            text = self.valueStrCache[id(tag)] = str(tag)
+        return text
+
+    def displayText(self, tag, column):
+        if column == 0:
+            parentTag, row = self.locations[id(tag)]
+            return self.childLabels(parentTag)[row]
+        if self.isContainer(tag):
+            return ""
+        return self.valueText(tag)
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        parentTag = self.tagFromIndex(parent)
+        tag = parentTag.tags[row]
+        self.locations[id(tag)] = (parentTag, row)
+        return self.createIndex(row, column, tag)
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        location = self.locations.get(id(index.internalPointer()))
+        if location is None or location[0] is self.nbtFile:
+            return QModelIndex()
+        parentTag = location[0]
+        parentLocation = self.locations.get(id(parentTag))
+        if parentLocation is None:
+            return QModelIndex()
+        return self.createIndex(parentLocation[1], 0, parentTag)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        tag = self.tagFromIndex(parent)
+        if self.isContainer(tag):
+            return len(tag.tags)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ("Name", "Value")[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tag = index.internalPointer()
+        if role == HIGHLIGHT_ROLE:
+            # one flag per row, shared by both columns
+            return self.roleData.get((id(tag), 0, role), False)
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return self.displayText(tag, column)
+        if role == Qt.EditRole:
+            if column == 0:
+                return tag.name or ""
+            return self.displayText(tag, column)
+        if role == Qt.ForegroundRole and column == 0 and tag.name in self.tagColors:
+            if type(self.locations[id(tag)][0]) is not nbt.TAG_List:
+                return self.tagColors[tag.name]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        tag = index.internalPointer()
+        if index.column() == 0:
+            tag.name = value
+            self.labels.pop(id(self.locations[id(tag)][0]), None)
+        elif self.isContainer(tag) or not isinstance(tag.value, (int, float, str)):
+            # arrays (list, bytearray) can't be rebuilt from their display text
+            return False
+        else:
+            if isinstance(tag.value, (int, float)):
+                try:
+                    value = type(tag.value)(value)
+                except ValueError:
+                    return False
+                try:
+                    # range-check against the tag's own struct format, or saving fails later
+                    tag.fmt.pack(value)
+                except (struct.error, OverflowError):
+                    return False
+            tag.value = value
+            self.valueStrCache.pop(id(tag), None)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def setRoleData(self, tag, column, role, value):
+        # no dataChanged here: callers repaint the affected rows themselves
+        self.roleData[(id(tag), column, role)] = value
+
+    def forget(self, tag):
+        self.locations.pop(id(tag), None)
+        self.valueStrCache.pop(id(tag), None)
+        self.labels.pop(id(tag), None)
+        self.roleData.pop((id(tag), 0, HIGHLIGHT_ROLE), None)
+        if self.isContainer(tag):
+            for child in tag.tags:
+                self.forget(child)
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        parentTag = self.tagFromIndex(parent)
+        if not self.isContainer(parentTag) or row < 0 or row + count > len(parentTag.tags):
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        for tag in parentTag.tags[row:row + count]:
+            self.forget(tag)
+        del parentTag.tags[row:row + count]
+        for i in range(row, len(parentTag.tags)):
+            self.locations[id(parentTag.tags[i])] = (parentTag, i)
+        self.labels.pop(id(parentTag), None)
+        self.endRemoveRows()
+        if parent.isValid():
+            # the parent's "[n] name" label now has a stale count
+            self.labels.pop(id(self.locations[id(parentTag)][0]), None)
+            self.dataChanged.emit(parent, parent)
+        return True
+
+class NBTLoader(QObject):
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, fileName):
+        super().__init__()
+        self.fileName = fileName
+
+    def run(self):
+        try:
+            fileExtension = os.path.splitext(self.fileName)[1]
+            if fileExtension == '.dat':
+                with open(self.fileName, 'rb', buffering=READ_BUFFER_SIZE) as raw, gzip.GzipFile(fileobj=raw) as f:
+                    nbtFile = nbt.NBTFile(buffer=f)
+            else:
+                nbtFile = nbt.NBTFile(self.fileName,'rb')
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.loaded.emit(nbtFile)
+
 class NBTViewer(QWidget):
     def __init__(self):
         super().__init__()
+        self.nbtFile = None
+        self.searchResults = []
+        self.searchResultIndex = 0
+        self.searchIndex = None
+        self.searchTags = []
+        self.searchLineStarts = []
+        self.prevHighlighted = None
+        self.loader = None
+        self.loaderThread = None
         self.initUI()
 
     def initUI(self):
@@ -70,7 +321,7 @@ class NBTViewer(QWidget):
                 padding-right: 15px;
                 color: #89dceb;
             }
-            QTreeWidget {
+            QTreeView {
                 background-color: #181825;
                 color: #bac2de;
                 border: 0px;
@@ -87,17 +338,17 @@ class NBTViewer(QWidget):
         self.toolbar = QToolBar()
         self.layout.addWidget(self.toolbar)
 
-        openAction = QAction(QIcon('open.png'), 'Open', self)
-        openAction.triggered.connect(self.openFile)
-        self.toolbar.addAction(openAction)
+        self.openAction = QAction(QIcon('open.png'), 'Open', self)
+        self.openAction.triggered.connect(self.openFile)
+        self.toolbar.addAction(self.openAction)
 
-        saveAction = QAction(QIcon('save.png'), 'Save', self)
-        saveAction.triggered.connect(self.saveFile)
-        self.toolbar.addAction(saveAction)
+        self.saveAction = QAction(QIcon('save.png'), 'Save', self)
+        self.saveAction.triggered.connect(self.saveFile)
+        self.toolbar.addAction(self.saveAction)
 
-        closeAction = QAction(QIcon('close.png'), 'Close', self)
-        closeAction.triggered.connect(self.closeFile)
-        self.toolbar.addAction(closeAction)
+        self.closeAction = QAction(QIcon('close.png'), 'Close', self)
+        self.closeAction.triggered.connect(self.closeFile)
+        self.toolbar.addAction(self.closeAction)
         self.toolbar.addSeparator()
 
         expandAllButton = QAction(QIcon('expandall.png'), 'Close', self)
@@ -128,10 +379,16 @@ class NBTViewer(QWidget):
         self.nextAction.setEnabled(False)
         self.toolbar.addAction(self.nextAction)
 
-        self.tree = QTreeWidget()
-        self.tree.setColumnCount(2)
-        self.tree.setHeaderLabels(["Name", "Value"])
-        self.tree.itemChanged.connect(self.updateNBT)
+        self.busyIndicator = QProgressBar()
+        self.busyIndicator.setRange(0, 0)
+        self.busyIndicator.setMaximumWidth(100)
+        self.busyAction = self.toolbar.addWidget(self.busyIndicator)
+        self.busyAction.setVisible(False)
+
+        self.model = NBTModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
         self.tree.setItemDelegate(CustomDelegate())
         self.tree.setAnimated(True)
         self.tree.setStyleSheet("""
@@ -151,21 +408,67 @@ class NBTViewer(QWidget):
         fileName, _ = QFileDialog.getOpenFileName(self, "QFileDialog.getOpenFileName()", "", "NBT Files (*.nbt *.dat)", options=options)
         if fileName:
             self.nbtFile = None
-            self.tree.clear()
-            fileExtension = os.path.splitext(fileName)[1]
-            if fileExtension == '.dat':
-                with gzip.open(fileName, 'rb') as f:
-                    self.nbtFile = nbt.NBTFile(buffer=f)
-            else:
-                self.nbtFile = nbt.NBTFile(fileName,'rb')
-            self.populateTree(self.nbtFile, self.tree)
+            self.searchResults = []
+            self.searchIndex = None
+            self.prevHighlighted = None
+            self.model.setRoot(None)
+            self.setLoading(True)
+            self.loaderThread = QThread(self)
+            self.loader = NBTLoader(fileName)
+            self.loader.moveToThread(self.loaderThread)
+            self.loaderThread.started.connect(self.loader.run)
+            self.loader.loaded.connect(self.onFileLoaded)
+            self.loader.failed.connect(self.onFileLoadFailed)
+            self.loader.loaded.connect(self.loaderThread.quit)
+            self.loader.failed.connect(self.loaderThread.quit)
+            self.loaderThread.finished.connect(self.onLoaderFinished)
+            self.loaderThread.finished.connect(self.loader.deleteLater)
+            self.loaderThread.finished.connect(self.loaderThread.deleteLater)
+            self.loaderThread.start()
+
+    def setLoading(self, loading):
+        self.busyAction.setVisible(loading)
+        self.openAction.setEnabled(not loading)
+        self.saveAction.setEnabled(not loading)
+        self.closeAction.setEnabled(not loading)
+
+    def onFileLoaded(self, nbtFile):
+        if self.sender() is not self.loader:
+            return
+        self.nbtFile = nbtFile
+        self.model.setRoot(self.nbtFile)
+        self.setLoading(False)
+
+    def onFileLoadFailed(self, message):
+        if self.sender() is not self.loader:
+            return
+        self.setLoading(False)
+        QMessageBox.warning(self, "Open", message)
+
+    def onLoaderFinished(self):
+        if self.sender() is self.loaderThread:
+            self.loader = None
+            self.loaderThread = None
+
+    def closeEvent(self, event):
+        if self.loaderThread is not None:
+            self.loaderThread.quit()
+            self.loaderThread.wait()
+        super().closeEvent(event)
 
     def closeFile(self):
         self.nbtFile = None
-        self.tree.clear()
+        self.searchResults = []
+        self.searchIndex = None
+        self.prevHighlighted = None
+        self.model.setRoot(None)
 
     def expandAll(self):
-        self.tree.expandAll()
+        self.tree.setUpdatesEnabled(False)
+        try:
+            self.tree.expandAll()
+        finally:
+            self.tree.setUpdatesEnabled(True)
 
     def onSearchInputChanged(self, text):
         if text:
@@ -178,64 +481,46 @@ class NBTViewer(QWidget):
             self.searchResultLabel.clear() 
             self.searchResultLabel.hide()
 
-    def populateTree(self, nbtFile, parent):
-        if isinstance(nbtFile, nbt.TAG_Compound):
-            for tag_name in nbtFile:
-                tag = nbtFile[tag_name]
-                item = QTreeWidgetItem(parent)
-                tag_colors = {
-                    "Pos": "#a6e3a1",
-                    "Inventory": "#cba6f7",
-                    "Health": "#f9e2af",
-                }
-
-                if tag_name in tag_colors:
-                    item.setForeground(0, QBrush(QColor(tag_colors[tag_name])))
-                if isinstance(tag, (nbt.TAG_Compound, nbt.TAG_List)):
-                    item.setText(0, f"[{len(tag)}] {tag_name}")
-                    self.populateTree(tag, item)
-                else:
-                    item.setText(0, f"\u00A0{tag_name}")
-                    item.setText(1, str(tag))
-                item.setData(0, Qt.UserRole, tag)
-        elif isinstance(nbtFile, nbt.TAG_List):
-            for i, tag in enumerate(nbtFile):
-                item = QTreeWidgetItem(parent)
-                if isinstance(tag, (nbt.TAG_Compound, nbt.TAG_List)):
-                    item.setText(0, f"[{len(tag)}] {i}")
-                    self.populateTree(tag, item)
-                else:
-                    item.setText(0, f"\u00A0{i}")
-                    item.setText(1, str(tag))
-                item.setData(0, Qt.UserRole, tag)
-        else:
-            item = QTreeWidgetItem(parent)
-            item.setText(0, f"\u00A0{nbtFile.name}")
-            item.setText(1, str(nbtFile.value))
-            item.setData(0, Qt.UserRole, nbtFile)
-
     def saveFile(self):
         options = QFileDialog.Options()
         fileName, _ = QFileDialog.getSaveFileName(self, "QFileDialog.getSaveFileName()", "", "NBT Files (*.nbt *.dat)", options=options)
         if fileName:
             fileExtension = os.path.splitext(fileName)[1]
             if fileExtension == '.dat':
-                with gzip.open(fileName, 'wb') as f:
-                    byte_io = BytesIO()
-                    self.nbtFile.write_file(buffer=byte_io)
-                    f.write(byte_io.getvalue())
+                with gzip.open(fileName, 'wb', compresslevel=6) as f:
+                    self.nbtFile.write_file(buffer=f)
             else:
                 self.nbtFile.write_file(fileName)
 
+    def buildSearchIndex(self):
+        # one "name<TAB>value" line per tag, scanned with a single regex in search()
+        lines = []
+        self.searchTags = []
+        for tag in self.model.walk():
+            name = self.model.displayText(tag, 0).replace("\n", " ")
+            value = self.model.displayText(tag, 1).replace("\n", " ")
+            lines.append(f"{name}\t{value}".lower())
+            self.searchTags.append(tag)
+        self.searchLineStarts = list(accumulate((len(line) + 1 for line in lines), initial=0))
+        self.searchIndex = "\n".join(lines)
+
     def search(self):
+        if self.searchIndex is None:
+            self.buildSearchIndex()
+        if not self.searchTags:
+            self.clearSearchResults()
+            return
+        pattern = re.compile(re.escape(self.searchField.text().lower()))
         self.searchResults = []
-        search_text = self.searchField.text()
-        iterator = QTreeWidgetItemIterator(self.tree)
-        while iterator.value():
-            item = iterator.value()
-            if search_text in item.text(0) or search_text in item.text(1):
-                self.searchResults.append(item)
-            iterator += 1
+        pos = 0
+        end = len(self.searchIndex)
+        while pos <= end:
+            match = pattern.search(self.searchIndex, pos)
+            if match is None:
+                break
+            line = bisect_right(self.searchLineStarts, match.start()) - 1
+            self.searchResults.append(self.searchTags[line])
+            pos = self.searchLineStarts[line + 1]
         self.searchResultIndex = 0
         self.updateSearchResultLabel()
         self.showCurrentSearchResult()
@@ -244,20 +529,21 @@ class NBTViewer(QWidget):
 
     def showCurrentSearchResult(self):
         if self.searchResults:
-            for item in self.searchResults:
-                item.setBackground(0, QBrush(QColor(24, 24, 37)))
-                item.setBackground(1, QBrush(QColor(49, 50, 68)))
-                item.setForeground(0, QBrush(QColor(186, 194, 222)))
-                item.setForeground(1, QBrush(QColor(186, 194, 222)))
-            item = self.searchResults[self.searchResultIndex]
-            item.setBackground(0, QBrush(QColor(116, 199, 236)))
-            item.setBackground(1, QBrush(QColor(116, 199, 236)))
-            item.setForeground(0, QBrush(QColor(17, 17, 27)))
-            item.setForeground(1, QBrush(QColor(17, 17, 27)))
-            self.tree.expandItem(item)
-            self.tree.scrollToItem(item)
-            index = self.tree.indexFromItem(item)
-            self.tree.scrollTo(index, QAbstractItemView.PositionAtCenter)
+            if self.prevHighlighted is not None:
+                self.model.setRoleData(self.prevHighlighted, 0, HIGHLIGHT_ROLE, False)
+                self.updateRow(self.prevHighlighted)
+            tag = self.searchResults[self.searchResultIndex]
+            self.model.setRoleData(tag, 0, HIGHLIGHT_ROLE, True)
+            self.updateRow(tag)
+            self.prevHighlighted = tag
+            nameIndex = self.model.indexForTag(tag, 0)
+            self.tree.expand(nameIndex)
+            self.tree.scrollTo(nameIndex, QAbstractItemView.PositionAtCenter)
+
+    def updateRow(self, tag):
+        nameRect = self.tree.visualRect(self.model.indexForTag(tag, 0))
+        valueRect = self.tree.visualRect(self.model.indexForTag(tag, 1))
+        self.tree.viewport().update(nameRect.united(valueRect))
 
     def nextSearchResult(self):
         if self.searchResults:
@@ -277,12 +563,6 @@ class NBTViewer(QWidget):
         else:
             self.searchResultLabel.setText("0/0")
 
-    def updateNBT(self, item, column):
-        if column == 1:
-            tag = item.data(0, Qt.UserRole)
-            if tag is not None:
-                tag.value = item.text(1)
-
     def showContextMenu(self, position):
         menu = QMenu()
         deleteAction = menu.addAction("Delete")
@@ -294,17 +574,35 @@ class NBTViewer(QWidget):
             self.editItem()
 
     def deleteItem(self):
-        item = self.tree.currentItem()
-        (item.parent() or self.tree).removeChild(item)
+        index = self.tree.currentIndex()
+        if index.isValid():
+            self.clearSearchResults()
+            self.model.removeRow(index.row(), index.parent())
+            self.searchIndex = None
+
+    def clearSearchResults(self):
+        if self.prevHighlighted is not None:
+            self.model.setRoleData(self.prevHighlighted, 0, HIGHLIGHT_ROLE, False)
+            self.updateRow(self.prevHighlighted)
+        self.searchResults = []
+        self.searchResultIndex = 0
+        self.prevHighlighted = None
+        self.updateSearchResultLabel()
 
     def editItem(self):
-        item = self.tree.currentItem()
+        index = self.tree.currentIndex()
+        if not index.isValid():
+            return
+        nameIndex = index.sibling(index.row(), 0)
+        valueIndex = index.sibling(index.row(), 1)
         dialog = QDialog()
         layout = QGridLayout()
         nameLabel = QLabel("Name")
-        nameEdit = QLineEdit(item.text(0))
+        name = nameIndex.data(Qt.EditRole)
+        value = valueIndex.data(Qt.EditRole)
+        nameEdit = QLineEdit(name)
         valueLabel = QLabel("Value")
-        valueEdit = QLineEdit(item.text(1))
+        valueEdit = QLineEdit(value)
         buttonBox = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         buttonBox.accepted.connect(dialog.accept)
         buttonBox.rejected.connect(dialog.reject)
@@ -315,8 +613,11 @@ class NBTViewer(QWidget):
         layout.addWidget(buttonBox, 2, 0, 1, 2)
         dialog.setLayout(layout)
         if dialog.exec_() == QDialog.Accepted:
-            item.setText(0, nameEdit.text())
-            item.setText(1, valueEdit.text())
+            if nameEdit.text() != name:
+                self.model.setData(nameIndex, nameEdit.text())
+            if valueEdit.text() != value and not self.model.setData(valueIndex, valueEdit.text()):
+                QMessageBox.warning(self, "Edit", f"Invalid value for this tag: {valueEdit.text()}")
+            self.searchIndex = None
 
 def main():
     app = QApplication(sys.argv)